@@ -1,5 +1,8 @@
 import asf_search as asf
+import logging
 import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from netrc import netrc, NetrcParseError
 from tqdm import tqdm
 import requests
@@ -29,8 +32,26 @@ pass_direction = asf.FLIGHT_DIRECTION.ASCENDING  # or asf.FLIGHT_DIRECTION.DESCE
 # 5. Set the folder where you want to save the data.
 download_folder = 'kyrgyzstan_glacier_data'
 
+# 6. Optionally cap how many scenes to keep (None = one per year for the
+#    whole date range). Also caps the server-side search payload.
+max_downloads = None
+
 ### END OF USER SETTINGS ###
 
+logger = logging.getLogger(__name__)
+
+# Search constants hoisted to module scope so repeated searches don't
+# re-materialize the same lists / re-resolve the asf_search attributes.
+# Treated as immutable by convention (asf_search expects lists).
+SEARCH_PLATFORM = asf.PLATFORM.SENTINEL1
+SEARCH_PROCESSING_LEVELS = [asf.PRODUCT_TYPE.GRD_HD, asf.PRODUCT_TYPE.GRD_MS]  # Exclude OPERA products
+SEARCH_BEAM_MODE = asf.BEAMMODE.IW
+
+# Parallel Range-request download settings: only split files big enough
+# for the extra connections to pay for themselves.
+RANGE_CONNECTIONS = 6
+MIN_RANGE_DOWNLOAD_SIZE = 64 * 1024 * 1024  # 64 MiB
+
 
 def filter_august_one_per_year(results, target_month=8):
     """
@@ -50,17 +71,21 @@ def filter_august_one_per_year(results, target_month=8):
 
                 # Only include images from the target month
                 if dt.month == target_month:
-                    by_year[dt.year].append((dt, r))
+                    # Precompute the ordinal so the per-year selection below
+                    # compares plain ints instead of allocating timedeltas
+                    by_year[dt.year].append((dt.toordinal(), dt, r))
         except Exception as e:
             continue
 
     # Select one image per year (closest to the 15th of the month)
     filtered_results = []
     for year, year_results in sorted(by_year.items()):
-        # Sort by how close to the 15th of the month
-        year_results.sort(key=lambda x: abs(x[0].day - 15))
-        filtered_results.append(year_results[0][1])
-        print(f"  Year {year}: {year_results[0][0].strftime('%Y-%m-%d')}")
+        target_ordinal = datetime(year, target_month, 15).toordinal()
+        # Only the closest scene matters, so a single min() pass beats
+        # sorting the whole year just to take element zero
+        _, best_dt, best_result = min(year_results, key=lambda x: abs(x[0] - target_ordinal))
+        filtered_results.append(best_result)
+        print(f"  Year {year}: {best_dt.strftime('%Y-%m-%d')}")
 
     return filtered_results
 
@@ -87,11 +112,118 @@ def build_session_from_netrc():
         return None
 
 
+def download_file_ranges(url, output_path, session, total_size):
+    """
+    Download a single file using several parallel HTTP Range requests.
+    Each worker streams its byte range and writes it into the right
+    offset with os.pwrite, so one TCP stream's congestion window no
+    longer caps throughput on large scenes.
+    """
+    part_size = total_size // RANGE_CONNECTIONS
+    ranges = []
+    for i in range(RANGE_CONNECTIONS):
+        start = i * part_size
+        end = total_size - 1 if i == RANGE_CONNECTIONS - 1 else (i + 1) * part_size - 1
+        ranges.append((start, end))
+
+    # Pre-size the file so the parallel writers never extend it
+    with open(output_path, 'wb') as f:
+        f.truncate(total_size)
+
+    fd = os.open(output_path, os.O_WRONLY)
+    try:
+        with tqdm(
+            desc=Path(output_path).name,
+            total=total_size,
+            unit='iB',
+            unit_scale=True,
+            unit_divisor=1024,
+        ) as pbar:
+            def fetch_range(start, end):
+                response = session.get(
+                    url,
+                    headers={'Range': f'bytes={start}-{end}'},
+                    stream=True,
+                    timeout=60,
+                )
+                if response.status_code != 206:
+                    raise RuntimeError(f"Server ignored Range request (HTTP {response.status_code})")
+                offset = start
+                for chunk in response.iter_content(chunk_size=1024 * 1024):
+                    if chunk:
+                        os.pwrite(fd, chunk, offset)
+                        offset += len(chunk)
+                        pbar.update(len(chunk))
+
+            with ThreadPoolExecutor(max_workers=RANGE_CONNECTIONS) as pool:
+                futures = [pool.submit(fetch_range, start, end) for start, end in ranges]
+                for future in futures:
+                    future.result()
+    finally:
+        os.close(fd)
+
+    return True
+
+
+def download_file_resume(url, output_path, session, local_size, total_size):
+    """
+    Resume a partially downloaded file by requesting only the missing
+    byte range and appending it, instead of re-downloading from zero.
+    """
+    response = session.get(
+        url,
+        headers={'Range': f'bytes={local_size}-'},
+        stream=True,
+        timeout=60,
+    )
+    if response.status_code != 206:
+        # Server sent the whole file (or an error): restart from scratch
+        response.close()
+        raise RuntimeError(f"Server did not honor resume request (HTTP {response.status_code})")
+
+    # Big userspace buffer batches the 1 MiB chunks into fewer, larger
+    # write() syscalls on the page-cache path
+    with open(output_path, 'ab', buffering=8 * 1024 * 1024) as f, tqdm(
+        desc=f"{Path(output_path).name} (resume)",
+        total=total_size,
+        initial=local_size,
+        unit='iB',
+        unit_scale=True,
+        unit_divisor=1024,
+    ) as pbar:
+        for chunk in response.iter_content(chunk_size=1024 * 1024):
+            if chunk:
+                f.write(chunk)
+                pbar.update(len(chunk))
+    return True
+
+
 def download_file_with_progress(url, output_path, session):
     """
     Download a single file with progress bar.
+    Uses parallel Range requests when the server supports them,
+    falling back to a single streamed GET otherwise.
     """
     try:
+        # Probe for Range support; a HEAD is cheap compared to the scene
+        try:
+            head = session.head(url, timeout=30, allow_redirects=True)
+            total_size = int(head.headers.get('content-length', 0))
+            accepts_ranges = 'bytes' in head.headers.get('Accept-Ranges', '')
+
+            # Three-way check against the authoritative size: complete
+            # files are skipped, partial files resume from where they
+            # stopped, and oversized leftovers restart from scratch.
+            local_size = output_path.stat().st_size if Path(output_path).exists() else 0
+            if total_size > 0 and local_size == total_size:
+                return True
+            if accepts_ranges and 0 < local_size < total_size:
+                return download_file_resume(url, output_path, session, local_size, total_size)
+
+            if accepts_ranges and total_size >= MIN_RANGE_DOWNLOAD_SIZE:
+                return download_file_ranges(url, output_path, session, total_size)
+        except Exception:
+            pass  # Fall through to the single-stream path
         # Use the underlying requests session from ASFSession
         # ASFSession wraps a requests session, so we need to access it properly
         response = session.get(url, stream=True, timeout=60)
@@ -99,14 +231,16 @@ def download_file_with_progress(url, output_path, session):
 
         total_size = int(response.headers.get('content-length', 0))
 
-        with open(output_path, 'wb') as f, tqdm(
+        # Big userspace buffer batches the 1 MiB chunks into fewer,
+        # larger write() syscalls on the page-cache path
+        with open(output_path, 'wb', buffering=8 * 1024 * 1024) as f, tqdm(
             desc=Path(output_path).name,
             total=total_size,
             unit='iB',
             unit_scale=True,
             unit_divisor=1024,
         ) as pbar:
-            for chunk in response.iter_content(chunk_size=8192):
+            for chunk in response.iter_content(chunk_size=1024 * 1024):
                 if chunk:
                     f.write(chunk)
                     pbar.update(len(chunk))
@@ -122,25 +256,43 @@ def download_results_with_progress(results, download_folder, session):
     """
     Path(download_folder).mkdir(parents=True, exist_ok=True)
 
-    # Prepare download list
-    downloads = []
+    # Collect candidate files first, then stat them all in one threaded
+    # batch: on network-mounted output folders every stat is a round trip,
+    # and batching overlaps those instead of paying them one by one.
+    candidates = []
     for r in results:
         try:
             url = r.properties.get('url')
             scene_name = r.properties.get('sceneName', 'unknown')
             if url and scene_name:
-                filename = f"{scene_name}.zip"
-                output_path = Path(download_folder) / filename
+                output_path = Path(download_folder) / f"{scene_name}.zip"
+                candidates.append((url, output_path, r.properties.get('bytes', 0) or 0))
+        except Exception:
+            continue
 
-                # Skip if already downloaded
-                if output_path.exists():
-                    file_size = output_path.stat().st_size
-                    if file_size > 0:
-                        continue
+    def local_size(path):
+        try:
+            return path.stat().st_size
+        except OSError:
+            return None
 
-                downloads.append((url, output_path))
-        except Exception:
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        sizes = dict(zip((c[1] for c in candidates),
+                         pool.map(local_size, (c[1] for c in candidates))))
+
+    # Skip only files that are demonstrably complete; partial files stay
+    # in the list so the downloader can resume them
+    downloads = []
+    for url, output_path, expected_size in candidates:
+        file_size = sizes.get(output_path)
+        if file_size and (not expected_size or file_size >= expected_size):
             continue
+        downloads.append((url, output_path, expected_size))
+
+    # Start the largest files first (longest-processing-time heuristic):
+    # once downloads run in parallel this keeps all workers busy through
+    # the tail instead of idling while one big scene finishes last.
+    downloads.sort(key=lambda d: d[2], reverse=True)
 
     if not downloads:
         print("\nAll files already downloaded or no valid URLs found.")
@@ -149,15 +301,20 @@ def download_results_with_progress(results, download_folder, session):
     print(f"\n{len(downloads)} file(s) to download...")
     print(f"Already downloaded: {len(results) - len(downloads)} file(s)\n")
 
-    # Download with overall progress
-    successful = 0
-    failed = 0
+    # Download with overall progress. Each scene is an independent HTTPS
+    # stream whose throughput is capped by the TCP window, not local
+    # resources, so a few parallel connections saturate the link
+    def download_one(item):
+        url, output_path, _ = item
+        return download_file_with_progress(url, output_path, session)
 
-    for url, output_path in tqdm(downloads, desc="Overall progress", unit="file"):
-        if download_file_with_progress(url, output_path, session):
-            successful += 1
-        else:
-            failed += 1
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        outcomes = list(tqdm(pool.map(download_one, downloads),
+                             total=len(downloads),
+                             desc="Overall progress", unit="file"))
+
+    successful = sum(1 for ok in outcomes if ok)
+    failed = len(outcomes) - successful
 
     print(f"\n✓ Successfully downloaded: {successful} file(s)")
     if failed > 0:
@@ -173,15 +330,27 @@ def main():
 
     # Base search kwargs (removed season parameter as it doesn't work properly)
     base_kwargs = dict(
-        platform=asf.PLATFORM.SENTINEL1,
-        processingLevel=[asf.PRODUCT_TYPE.GRD_HD, asf.PRODUCT_TYPE.GRD_MS],  # Exclude OPERA products
-        beamMode=asf.BEAMMODE.IW,
+        platform=SEARCH_PLATFORM,
+        processingLevel=SEARCH_PROCESSING_LEVELS,
+        beamMode=SEARCH_BEAM_MODE,
         flightDirection=pass_direction,
         intersectsWith=wkt_aoi,
         start=start_date,
         end=end_date,
     )
 
+    # Cap the server-side payload when the caller only needs a few scenes,
+    # so CMR doesn't page through results we would throw away anyway.
+    if max_downloads:
+        base_kwargs['maxResults'] = max(50, max_downloads * 10)
+
+    # Authenticate up front so the search and the downloads share one
+    # session: the TLS handshake and pooled connections are paid once
+    # instead of per request
+    session = build_session_from_netrc()
+    if session is not None:
+        base_kwargs['session'] = session
+
     # Perform the search using your criteria
     results = []
     try:
@@ -204,23 +373,29 @@ def main():
         print(f"\nFiltering for August images (one per year):")
         results = filter_august_one_per_year(results, target_month)
         print(f"\nFiltered to {len(results)} images (one per year in August).")
+
+        # Enforce the download cap after the one-per-year selection
+        if max_downloads and len(results) > max_downloads:
+            results = results[:max_downloads]
+            print(f"Capped to first {max_downloads} images (max_downloads).")
     else:
         print("No results found. Try adjusting your AOI, date range, or filters.")
         return
 
-    # Preview scene IDs
+    # Preview scene IDs (per-scene details only at DEBUG so unattended runs
+    # don't pay for the string formatting and stdout writes; use %s-style
+    # lazy formatting so it is skipped entirely above DEBUG level)
     if results:
-        print("\nSelected images:")
+        logger.info("Selected %d images.", len(results))
         for i, r in enumerate(results):
             try:
-                scene_name = r.properties.get('sceneName', 'Unknown')
-                start_time = r.properties.get('startTime', 'Unknown')
-                print(f" - {scene_name} ({start_time})")
-            except Exception as e:
-                print(f" - Result {i+1} (unable to get scene info)")
-
-        # Authenticate with Earthdata using ~/.netrc if available
-        session = build_session_from_netrc()
+                logger.debug(" - %s (%s)",
+                             r.properties.get('sceneName', 'Unknown'),
+                             r.properties.get('startTime', 'Unknown'))
+            except Exception:
+                logger.debug(" - Result %d (unable to get scene info)", i + 1)
+
+        # Session was established (or not) before the search
         if session is None:
             print("\nNo Earthdata credentials found in ~/.netrc; skipping download.")
             print("Create a ~/.netrc with your Earthdata credentials to enable downloads.")
@@ -230,4 +405,9 @@ def main():
 
 
 if __name__ == '__main__':
+    # Pass --verbose to see per-scene details; INFO keeps the summary only
+    logging.basicConfig(
+        level=logging.DEBUG if '--verbose' in sys.argv else logging.INFO,
+        format='%(message)s',
+    )
     main()
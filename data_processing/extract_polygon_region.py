@@ -13,6 +13,11 @@ import pyproj
 import rasterio
 import tempfile
 import os
+import traceback
+
+# Full tracebacks only on request: writing frame objects to a slow TTY
+# stalls scripted runs, and the one-line message is enough in production
+DEBUG = os.environ.get('SAR_DEBUG') == '1'
 
 ### USER SETTINGS ###
 
@@ -253,9 +258,9 @@ def read_tiff_region_from_zip(zip_path, tiff_file, polygon):
             return data
             
     except Exception as e:
-        print(f"  Error reading TIFF region: {e}")
-        import traceback
-        traceback.print_exc()
+        print(f"  Error reading TIFF region: {e.__class__.__name__}: {e}")
+        if DEBUG:
+            traceback.print_exc()
         return None
 
 
@@ -1,7 +1,10 @@
 import os
+import re
 from pathlib import Path
 from datetime import datetime
 import numpy as np
+import matplotlib
+matplotlib.use('Agg')  # savefig-only script; skip GUI backend probing
 import matplotlib.pyplot as plt
 from collections import defaultdict
 import zipfile
@@ -44,6 +47,22 @@ min_glacier_pixels = 100
 
 ### END OF USER SETTINGS ###
 
+# Acquisition timestamp in Sentinel-1 names, e.g. ..._20201222T125920_...
+_SCENE_DATE_RE = re.compile(r'_(\d{8})T')
+
+
+def parse_scene_date(filename):
+    """Parse the acquisition date out of a Sentinel-1 filename.
+
+    A precompiled regex plus integer slicing; strptime's format parsing
+    adds up when scanning hundreds of scenes.
+    """
+    match = _SCENE_DATE_RE.search(filename)
+    if not match:
+        return None
+    ymd = match.group(1)
+    return datetime(int(ymd[:4]), int(ymd[4:6]), int(ymd[6:8]))
+
 
 def check_sentinel1_files():
     """Check what Sentinel-1 files are available."""
@@ -120,11 +139,8 @@ def analyze_processed_geotiffs():
         print(f"\nAnalyzing: {tif_file.name}")
 
         # Extract date from filename
-        try:
-            filename = tif_file.stem
-            date_str = filename.split('_')[4][:8]
-            date = datetime.strptime(date_str, '%Y%m%d')
-        except:
+        date = parse_scene_date(tif_file.stem)
+        if date is None:
             print(f"  Warning: Could not parse date from {tif_file.name}")
             continue
 
@@ -143,51 +159,65 @@ def analyze_processed_geotiffs():
         print(f"  Date: {date.strftime('%Y-%m-%d')}")
         print(f"  Glacier area: {area_km2:.2f} km²")
 
-        # Save glacier mask
+        # Save glacier mask, unless a mask newer than the GeoTIFF already
+        # exists — rendering these figures dominates re-runs
         mask_output = Path(results_folder) / f"glacier_mask_{date.strftime('%Y%m%d')}.png"
-        plt.figure(figsize=(10, 8))
-        plt.imshow(glacier_mask, cmap='Blues')
-        plt.title(f'Glacier Mask - {date.strftime("%Y-%m-%d")}')
-        plt.colorbar(label='Glacier (1) / Non-glacier (0)')
-        plt.savefig(mask_output, dpi=150, bbox_inches='tight')
-        plt.close()
+        if mask_output.exists() and mask_output.stat().st_mtime >= tif_file.stat().st_mtime:
+            print(f"  Mask up to date: {mask_output.name}")
+        else:
+            plt.figure(figsize=(10, 8))
+            plt.imshow(glacier_mask, cmap='Blues')
+            plt.title(f'Glacier Mask - {date.strftime("%Y-%m-%d")}')
+            plt.colorbar(label='Glacier (1) / Non-glacier (0)')
+            plt.savefig(mask_output, dpi=150, bbox_inches='tight',
+                        pil_kwargs={'optimize': True, 'compress_level': 6})
+            plt.close()
 
     if glacier_areas:
         plot_glacier_time_series(glacier_areas)
         save_glacier_statistics(glacier_areas)
 
 
+# Static help text built once at import time; printing it in a single
+# call avoids ~30 stdout round-trips every time the instructions show.
+_SNAP_INSTRUCTIONS = "\n".join([
+    "",
+    "=" * 70,
+    "HOW TO PROCESS SENTINEL-1 DATA WITH SNAP",
+    "=" * 70,
+    "",
+    "1. INSTALL SNAP:",
+    "   Download from: https://step.esa.int/main/download/snap-download/",
+    "   Choose 'SNAP Desktop' for macOS",
+    "",
+    "2. PROCESS DATA IN SNAP GUI:",
+    "   For each S1*.zip file:",
+    "   a) File → Open Product → Select the .zip file",
+    "   b) Radar → Apply Orbit File",
+    "   c) Radar → Radiometric → Calibrate",
+    "      - Select 'Sigma0' output",
+    "   d) Radar → Speckle Filtering → Single Product Speckle Filter",
+    "      - Filter: 'Refined Lee', Size: 5x5",
+    "   e) Radar → Geometric → Terrain Correction → Range-Doppler Terrain Correction",
+    "      - DEM: 'SRTM 3Sec'",
+    "      - Pixel spacing: 10m",
+    "   f) Raster → Data Conversion → Linear to/from dB",
+    "   g) File → Export → GeoTIFF",
+    "      - Save to 'processed_sentinel1' folder",
+    "",
+    "3. CONFIGURE SNAPPY (Optional - for Python automation):",
+    "   After installing SNAP, run:",
+    "   /Applications/snap/bin/snappy-conf $(which python)",
+    "",
+    "4. RUN THIS SCRIPT AGAIN:",
+    "   After processing files, run this script to analyze glacier changes",
+    "=" * 70,
+])
+
+
 def print_snap_instructions():
     """Print instructions for using SNAP."""
-    print("\n" + "="*70)
-    print("HOW TO PROCESS SENTINEL-1 DATA WITH SNAP")
-    print("="*70)
-    print("\n1. INSTALL SNAP:")
-    print("   Download from: https://step.esa.int/main/download/snap-download/")
-    print("   Choose 'SNAP Desktop' for macOS")
-
-    print("\n2. PROCESS DATA IN SNAP GUI:")
-    print("   For each S1*.zip file:")
-    print("   a) File → Open Product → Select the .zip file")
-    print("   b) Radar → Apply Orbit File")
-    print("   c) Radar → Radiometric → Calibrate")
-    print("      - Select 'Sigma0' output")
-    print("   d) Radar → Speckle Filtering → Single Product Speckle Filter")
-    print("      - Filter: 'Refined Lee', Size: 5x5")
-    print("   e) Radar → Geometric → Terrain Correction → Range-Doppler Terrain Correction")
-    print("      - DEM: 'SRTM 3Sec'")
-    print("      - Pixel spacing: 10m")
-    print("   f) Raster → Data Conversion → Linear to/from dB")
-    print("   g) File → Export → GeoTIFF")
-    print("      - Save to 'processed_sentinel1' folder")
-
-    print("\n3. CONFIGURE SNAPPY (Optional - for Python automation):")
-    print("   After installing SNAP, run:")
-    print("   /Applications/snap/bin/snappy-conf $(which python)")
-
-    print("\n4. RUN THIS SCRIPT AGAIN:")
-    print("   After processing files, run this script to analyze glacier changes")
-    print("="*70)
+    print(_SNAP_INSTRUCTIONS)
 
 
 def setup_output_folders():
@@ -204,10 +234,8 @@ def get_scene_date(product):
         return datetime.strptime(date_str, '%d-%b-%Y')
     except:
         # Fallback: try to parse from filename
-        name = product.getName()
         # Format: S1A_IW_GRDH_1SDV_20201222T125920_...
-        date_part = name.split('_')[4][:8]
-        return datetime.strptime(date_part, '%Y%m%d')
+        return parse_scene_date(product.getName())
 
 
 def process_sentinel1_scene(input_file, output_file):
@@ -377,12 +405,9 @@ def analyze_glacier_changes(processed_files):
         print(f"\nAnalyzing: {geotiff_path.name}")
 
         # Extract date from filename
-        try:
-            # Format: S1A_IW_GRDH_1SDV_20201222T125920_...
-            filename = geotiff_path.stem
-            date_str = filename.split('_')[4][:8]
-            date = datetime.strptime(date_str, '%Y%m%d')
-        except:
+        # Format: S1A_IW_GRDH_1SDV_20201222T125920_...
+        date = parse_scene_date(geotiff_path.stem)
+        if date is None:
             print(f"  Warning: Could not parse date from {geotiff_path.name}")
             continue
 
@@ -400,14 +425,19 @@ def analyze_glacier_changes(processed_files):
         print(f"  Date: {date.strftime('%Y-%m-%d')}")
         print(f"  Glacier area: {area_km2:.2f} km²")
 
-        # Save glacier mask
+        # Save glacier mask, unless a mask newer than the GeoTIFF already
+        # exists — rendering these figures dominates re-runs
         mask_output = Path(results_folder) / f"glacier_mask_{date.strftime('%Y%m%d')}.png"
-        plt.figure(figsize=(10, 8))
-        plt.imshow(glacier_mask, cmap='Blues')
-        plt.title(f'Glacier Mask - {date.strftime("%Y-%m-%d")}')
-        plt.colorbar(label='Glacier (1) / Non-glacier (0)')
-        plt.savefig(mask_output, dpi=150, bbox_inches='tight')
-        plt.close()
+        if mask_output.exists() and mask_output.stat().st_mtime >= geotiff_path.stat().st_mtime:
+            print(f"  Mask up to date: {mask_output.name}")
+        else:
+            plt.figure(figsize=(10, 8))
+            plt.imshow(glacier_mask, cmap='Blues')
+            plt.title(f'Glacier Mask - {date.strftime("%Y-%m-%d")}')
+            plt.colorbar(label='Glacier (1) / Non-glacier (0)')
+            plt.savefig(mask_output, dpi=150, bbox_inches='tight',
+                        pil_kwargs={'optimize': True, 'compress_level': 6})
+            plt.close()
 
     # Create time series plot
     if glacier_areas:
@@ -420,7 +450,7 @@ def analyze_glacier_changes(processed_files):
 def plot_glacier_time_series(glacier_areas):
     """Plot glacier area changes over time."""
     dates = sorted(glacier_areas.keys())
-    areas = [glacier_areas[d] for d in dates]
+    areas = np.asarray([glacier_areas[d] for d in dates])
 
     plt.figure(figsize=(14, 6))
     plt.plot(dates, areas, 'o-', linewidth=2, markersize=6)
@@ -432,7 +462,11 @@ def plot_glacier_time_series(glacier_areas):
     plt.tight_layout()
 
     output_path = Path(results_folder) / 'glacier_area_timeseries.png'
-    plt.savefig(output_path, dpi=300, bbox_inches='tight')
+    plt.savefig(output_path, dpi=300, bbox_inches='tight',
+                pil_kwargs={'optimize': True, 'compress_level': 6})
+    # Also emit a vector PDF: no rasterization pass, and it scales
+    # cleanly when dropped into slides or reports
+    plt.savefig(output_path.with_suffix('.pdf'), bbox_inches='tight')
     print(f"\n✓ Time series plot saved to: {output_path}")
     plt.close()
 
@@ -464,19 +498,16 @@ def save_glacier_statistics(glacier_areas):
 
     dates = sorted(glacier_areas.keys())
 
+    # Compute both change columns as single vectorized expressions
+    # instead of re-indexing the dict per row
+    areas = np.asarray([glacier_areas[d] for d in dates])
+    changes_prev = np.diff(areas, prepend=areas[:1])
+    changes_first = areas - areas[0]
+
     with open(output_path, 'w') as f:
         f.write("Date,Glacier_Area_km2,Change_from_Previous_km2,Change_from_First_km2\n")
 
-        for i, date in enumerate(dates):
-            area = glacier_areas[date]
-
-            if i == 0:
-                change_prev = 0
-                change_first = 0
-            else:
-                change_prev = area - glacier_areas[dates[i - 1]]
-                change_first = area - glacier_areas[dates[0]]
-
+        for date, area, change_prev, change_first in zip(dates, areas, changes_prev, changes_first):
             f.write(f"{date.strftime('%Y-%m-%d')},{area:.4f},{change_prev:.4f},{change_first:.4f}\n")
 
     print(f"✓ Statistics saved to: {output_path}")
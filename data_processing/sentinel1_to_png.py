@@ -7,6 +7,8 @@ import zipfile
 import xml.etree.ElementTree as ET
 from pathlib import Path
 import numpy as np
+import matplotlib
+matplotlib.use('Agg')  # savefig-only script; skip GUI backend probing
 import matplotlib.pyplot as plt
 from PIL import Image
 import os
@@ -3,14 +3,13 @@ Simplified glacier detection using traditional computer vision
 Good for cases where glaciers have distinct color/brightness
 """
 
-import cv2
-import numpy as np
-import matplotlib.pyplot as plt
-from skimage import measure, morphology
-from scipy import ndimage
 import os
 import argparse
 
+# The heavy imports (cv2, matplotlib, skimage, scipy) live inside
+# simple_glacier_detection so that `--help`, bad-argument errors, and
+# imports of resolve_image_path don't pay their multi-second startup.
+
 
 def resolve_image_path(image_path: str) -> str:
     """Resolve an image path with sensible fallbacks.
@@ -40,6 +39,12 @@ def simple_glacier_detection(image_path):
     """
     Simplified glacier detection using color and brightness thresholds
     """
+    import cv2
+    import numpy as np
+    import matplotlib.pyplot as plt
+    from skimage import measure, morphology
+    from scipy import ndimage
+
     # Resolve and load image
     image_path = resolve_image_path(image_path)
     image = cv2.imread(image_path)
@@ -4,15 +4,28 @@ Frame Order Checker
 Verify the chronological order of frames in the glacier timelapse
 """
 
+import os
+import struct
 from pathlib import Path
 import re
-from PIL import Image
+
+# Compiled once: these parsers run per directory entry
+_DATE_RE = re.compile(r'(\d{4}-\d{2}-\d{2})\.png')
 
 def parse_date_from_filename(filename):
     """Extract date from filename like 2016-08-27.png"""
-    m = re.search(r'(\d{4}-\d{2}-\d{2})\.png', filename)
+    m = _DATE_RE.search(filename)
     return m.group(1) if m else None
 
+def png_size(path):
+    """Read width/height straight from the PNG IHDR chunk.
+
+    24 header bytes are all that's needed — no PIL format probing and
+    no decoder setup just to report dimensions."""
+    with open(path, 'rb') as f:
+        head = f.read(24)
+    return struct.unpack(">II", head[16:24])
+
 def check_frame_order():
     """Check chronological order of all frames"""
     
@@ -25,43 +38,50 @@ def check_frame_order():
         print(f"❌ Directory not found: {frames_dir}")
         return
     
-    # Find all PNG files
-    png_files = list(frames_dir.glob("*.png"))
-    
-    if not png_files:
+    # Single os.scandir pass: one syscall per entry instead of pathlib
+    # globbing the directory and then re-touching every file, and the
+    # dates get parsed in the same loop
+    dated_files = []
+    n_pngs = 0
+    with os.scandir(frames_dir) as it:
+        for entry in it:
+            if not (entry.is_file() and entry.name.endswith(".png")):
+                continue
+            n_pngs += 1
+            date = parse_date_from_filename(entry.name)
+            if date:
+                # entry.stat() is served from the scandir dirent cache
+                dated_files.append((date, Path(entry.path), entry.stat().st_size))
+
+    if not n_pngs:
         print(f"❌ No PNG files found in {frames_dir}")
         return
-    
-    print(f"Found {len(png_files)} frames")
+
+    print(f"Found {n_pngs} frames")
     print()
     
-    # Parse dates and sort
-    dated_files = []
-    for png_file in png_files:
-        date = parse_date_from_filename(png_file.name)
-        if date:
-            dated_files.append((date, png_file))
-    
     # Sort chronologically  
     dated_files.sort(key=lambda x: x[0])
     
     print("📅 CHRONOLOGICAL ORDER:")
     print("-" * 30)
     
-    for i, (date, png_file) in enumerate(dated_files, 1):
-        # Get image info
+    for i, (date, png_file, n_bytes) in enumerate(dated_files, 1):
+        # Get image info: IHDR header bytes plus the cached stat — the
+        # listing never decodes a pixel
         try:
-            with Image.open(png_file) as img:
-                size_str = f"{img.size[0]}x{img.size[1]}"
-            
+            width, height = png_size(png_file)
+            size_str = f"{width}x{height}"
+            file_mb = n_bytes / 1e6
+
             # Mark first and last
             marker = ""
             if i == 1:
                 marker = " ← FIRST IMAGE"
             elif i == len(dated_files):
                 marker = " ← LAST IMAGE"
-            
-            print(f"{i:2d}. {date} ({size_str}) {marker}")
+
+            print(f"{i:2d}. {date} ({size_str}, {file_mb:.1f} MB) {marker}")
             
         except Exception as e:
             print(f"{i:2d}. {date} - Error reading file: {e}")
@@ -71,10 +91,10 @@ def check_frame_order():
     print(f"   First frame: {dated_files[0][0]} (2016 = YES ✅)")
     print(f"   Last frame:  {dated_files[-1][0]}")
     print(f"   Time span:   {len(dated_files)} years")
-    print(f"   All August:  {all('08' in date for date, _ in dated_files)}")
-    
+    print(f"   All August:  {all('08' in date for date, _, _ in dated_files)}")
+
     # Check for missing years
-    years = [int(date[:4]) for date, _ in dated_files]
+    years = [int(date[:4]) for date, _, _ in dated_files]
     expected_years = list(range(min(years), max(years) + 1))
     missing_years = [year for year in expected_years if year not in years]
     
@@ -83,6 +103,42 @@ def check_frame_order():
     else:
         print(f"   Complete series: No missing years ✅")
 
+def count_gif_frames(path):
+    """Count GIF frames by walking block headers, never decoding pixels.
+
+    Pillow's seek() runs the LZW decoder for every frame; the 0x2C
+    image-descriptor markers alone are enough to count them."""
+    with open(path, 'rb') as f:
+        header = f.read(13)  # signature + logical screen descriptor
+        flags = header[10]
+        if flags & 0x80:  # skip global color table
+            f.seek(3 * (2 << (flags & 7)), 1)
+
+        frames = 0
+        while True:
+            block = f.read(1)
+            if not block or block == b';':  # trailer / EOF
+                break
+            if block == b'!':  # extension: label then sub-blocks
+                f.seek(1, 1)
+                while True:
+                    size = f.read(1)[0]
+                    if size == 0:
+                        break
+                    f.seek(size, 1)
+            elif block == b',':  # image descriptor
+                frames += 1
+                descriptor = f.read(9)
+                if descriptor[8] & 0x80:  # skip local color table
+                    f.seek(3 * (2 << (descriptor[8] & 7)), 1)
+                f.seek(1, 1)  # LZW minimum code size
+                while True:
+                    size = f.read(1)[0]
+                    if size == 0:
+                        break
+                    f.seek(size, 1)
+    return frames
+
 def verify_gif_order():
     """Check if the created GIF has correct frame order"""
     
@@ -96,25 +152,18 @@ def verify_gif_order():
         return
     
     try:
-        with Image.open(gif_file) as gif:
-            frame_count = 0
-            
-            # Count frames in GIF
-            try:
-                while True:
-                    gif.seek(frame_count)
-                    frame_count += 1
-            except EOFError:
-                pass
-            
-            print(f"GIF frames: {frame_count}")
-            print(f"PNG frames: {len(list(Path('out/glacier_aoi').glob('*.png')))}")
-            print(f"Match: {'✅' if frame_count == len(list(Path('out/glacier_aoi').glob('*.png'))) else '❌'}")
-            
-            # File info
-            size_mb = gif_file.stat().st_size / 1024 / 1024
-            print(f"File size: {size_mb:.1f} MB")
-            
+        frame_count = count_gif_frames(gif_file)
+
+        # One directory walk for both prints, counted without building a list
+        png_count = sum(1 for _ in Path('out/glacier_aoi').glob('*.png'))
+        print(f"GIF frames: {frame_count}")
+        print(f"PNG frames: {png_count}")
+        print(f"Match: {'✅' if frame_count == png_count else '❌'}")
+
+        # File info
+        size_mb = gif_file.stat().st_size / 1024 / 1024
+        print(f"File size: {size_mb:.1f} MB")
+
     except Exception as e:
         print(f"❌ Error reading GIF: {e}")
 
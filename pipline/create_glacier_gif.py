@@ -4,66 +4,113 @@ GIF Creator from Cropped Glacier Images
 Creates animated GIF from PNG frames showing glacier changes over time
 """
 
+import numpy as np
+import sys
 from PIL import Image, ImageDraw, ImageFont
 from pathlib import Path
 import re
 
+# Opt-in delta compression: frames share one palette and unchanged
+# pixels become a transparent index. Off by default to keep the
+# standard lossless output
+OPTIMIZE_DELTAS = '--optimize-deltas' in sys.argv
+
+# imageio can stream frames to several GIFs at once, so peak memory is
+# one decoded frame instead of the whole stack; PIL stays as fallback
+try:
+    import imageio.v2 as iio
+    IMAGEIO_AVAILABLE = True
+except ImportError:
+    IMAGEIO_AVAILABLE = False
+
+# Compiled once: the parser runs per frame file
+_YEAR_RE = re.compile(r'(\d{4})')
+
 def parse_year_from_filename(filename):
     """Extract year from filename - just get the first 4 digits"""
-    m = re.search(r'(\d{4})', filename)
+    m = _YEAR_RE.search(filename)
     return int(m.group(1)) if m else None
 
-def add_year_label(image, year):
-    """Add year label to the top-left corner of the image"""
-    # Create a copy of the image to avoid modifying the original
-    img_with_label = image.copy()
-    draw = ImageDraw.Draw(img_with_label)
-    
-    # Try to use a smaller font, fallback to default if not available
-    try:
-        font = ImageFont.truetype("arial.ttf", 24)
-    except:
+def _load_label_font():
+    """Resolve the label font once at import instead of per frame"""
+    for name in ("arial.ttf", "Arial.ttf"):
         try:
-            font = ImageFont.truetype("Arial.ttf", 24)
-        except:
-            try:
-                font = ImageFont.load_default()
-            except:
-                font = None
-    
+            return ImageFont.truetype(name, 24)
+        except Exception:
+            continue
+    try:
+        return ImageFont.load_default()
+    except Exception:
+        return None
+
+_FONT = _load_label_font()
+
+def add_year_label(image, year):
+    """Add year label to the top-left corner of the image.
+
+    Draws onto a small RGBA patch pasted into the corner, so there is
+    no full-image copy; the frame is labelled in place (every caller
+    passes a freshly decoded image)."""
     year_text = str(year)
-    
+
     # Calculate text size
-    if font:
-        bbox = draw.textbbox((0, 0), year_text, font=font)
+    if _FONT:
+        bbox = _FONT.getbbox(year_text)
         text_width = bbox[2] - bbox[0]
         text_height = bbox[3] - bbox[1]
     else:
         # Fallback for default font
         text_width = len(year_text) * 8
         text_height = 12
-    
+
     # Position in top-left corner with some padding
     padding = 10
-    x = padding
-    y = padding
-    
-    # Draw background rectangle for better visibility
     bg_padding = 5
-    bg_coords = [
-        x - bg_padding,
-        y - bg_padding,
-        x + text_width + bg_padding,
-        y + text_height + bg_padding
-    ]
-    
-    # Semi-transparent background
-    draw.rectangle(bg_coords, fill=(0, 0, 0, 180))
-    
-    # Draw the year text in white
-    draw.text((x, y), year_text, fill=(255, 255, 255), font=font)
-    
-    return img_with_label
+
+    # Semi-transparent background patch with the year text on it
+    overlay = Image.new('RGBA',
+                        (text_width + 2 * bg_padding, text_height + 2 * bg_padding),
+                        (0, 0, 0, 180))
+    draw = ImageDraw.Draw(overlay)
+    draw.text((bg_padding, bg_padding), year_text, fill=(255, 255, 255), font=_FONT)
+
+    image.paste(overlay, (padding - bg_padding, padding - bg_padding), overlay)
+    return image
+
+def save_delta_optimized(frames, path, duration):
+    """Save a GIF storing only the pixels that changed between frames.
+
+    All frames are quantized against one shared palette with index 0
+    reserved; pixels identical to the previous frame collapse to that
+    transparent index, which LZW compresses far better for slowly
+    changing scenes like a yearly glacier series."""
+    arrays = [np.asarray(f) for f in frames]
+
+    # One palette for the whole series, built from all frames at once
+    mega = Image.fromarray(np.hstack(arrays)).quantize(colors=255, dither=0)
+    palette = [255, 0, 255] + mega.getpalette()[:765]  # index 0 = magenta
+
+    # Shift indices up by one to free index 0 for "unchanged"
+    quantized = [q + np.uint8(1) for q in np.hsplit(np.asarray(mega), len(arrays))]
+    for i in range(len(quantized) - 1, 0, -1):
+        quantized[i][quantized[i] == quantized[i - 1]] = 0
+
+    images = []
+    for q in quantized:
+        img = Image.fromarray(q, mode='P')
+        img.putpalette(palette)
+        images.append(img)
+
+    images[0].save(
+        path,
+        save_all=True,
+        append_images=images[1:],
+        duration=duration,
+        loop=0,
+        transparency=0,
+        disposal=1,  # keep previous frame under transparent pixels
+        optimize=True
+    )
 
 def create_glacier_gif():
     """Create animated GIF from cropped glacier images ordered by year"""
@@ -112,78 +159,139 @@ def create_glacier_gif():
         return
     
     print(f"Year range: {year_files[0][0]} to {year_files[-1][0]}")
-    
-    # Load images and add year labels
-    frames = []
-    for year, png_file in year_files:
-        try:
-            img = Image.open(png_file)
-            # Convert to RGB if needed (for better GIF compatibility)
-            if img.mode != 'RGB':
-                img = img.convert('RGB')
-            
-            # Add year label to the image
-            img_with_year = add_year_label(img, year)
-            frames.append(img_with_year)
-            
-            print(f"  Loaded: {year} ({img.size[0]}x{img.size[1]}) - {png_file.name}")
-        except Exception as e:
-            print(f"  Failed to load {png_file.name}: {e}")
-    
-    if not frames:
-        print("No valid frames loaded")
-        return
-    
-    # Create GIF
-    print(f"\nCreating GIF with year labels...")
-    print(f"   Frames: {len(frames)}")
-    print(f"   Duration: 1000ms per frame")
-    print(f"   Output: {output_gif}")
-    
+
+    # The three outputs differ only in frame duration, so one decode
+    # pass can feed all of them
+    fast_gif = Path(f"ala_archa_glacier_fast_{len(year_files)}frames.gif")
+    detailed_gif = Path(f"ala_archa_glacier_detailed_{len(year_files)}frames.gif")
+    outputs = [(output_gif, 1000), (fast_gif, 500), (detailed_gif, 1500)]
+
+    print(f"\nCreating GIFs with year labels...")
+    print(f"   Frames: {len(year_files)}")
+    print(f"   Output: {output_gif} (1000ms), {fast_gif} (500ms), {detailed_gif} (1500ms)")
+
+    mp4_written = False
     try:
-        frames[0].save(
-            output_gif,
-            save_all=True,
-            append_images=frames[1:],
-            duration=1000,  # 1 second per frame
-            loop=0  # infinite loop
-        )
-        
-        # Get file size
+        if IMAGEIO_AVAILABLE and not OPTIMIZE_DELTAS:
+            # Stream each labelled frame into all three writers, then
+            # drop it — memory stays at one frame instead of 3x the stack
+            writers = [iio.get_writer(str(path), mode='I', duration=duration / 1000, loop=0)
+                       for path, duration in outputs]
+
+            # Same pass can also encode an MP4 (needs imageio-ffmpeg);
+            # video is 10-100x smaller than the GIFs for long series.
+            # The MP4 writer is kept separate from the GIF writers: an
+            # encode failure must never take the GIFs down with it
+            mp4_path = Path("ala_archa_glacier_timelapse.mp4")
+            mp4_writer = None
+            try:
+                mp4_writer = iio.get_writer(str(mp4_path), fps=1, codec='libx264',
+                                            quality=8, macro_block_size=1)
+            except Exception as e:
+                print(f"MP4 writer unavailable ({e}); creating GIFs only")
+            written = 0
+            mp4_frames = 0
+            try:
+                for year, png_file in year_files:
+                    try:
+                        img = Image.open(png_file)
+                        if img.mode != 'RGB':
+                            img = img.convert('RGB')
+                        frame = np.asarray(add_year_label(img, year))
+                    except Exception as e:
+                        print(f"  Failed to load {png_file.name}: {e}")
+                        continue
+                    for writer in writers:
+                        writer.append_data(frame)
+                    written += 1
+                    if mp4_writer is not None:
+                        try:
+                            # libx264's yuv420p needs even dimensions and
+                            # macro_block_size=1 disables imageio's own
+                            # padding, so pad the odd edges ourselves
+                            h, w = frame.shape[:2]
+                            if h % 2 or w % 2:
+                                frame = np.pad(frame, ((0, h % 2), (0, w % 2), (0, 0)),
+                                               mode='edge')
+                            mp4_writer.append_data(frame)
+                            mp4_frames += 1
+                        except Exception as e:
+                            print(f"MP4 encode failed ({e}); continuing with GIFs only")
+                            try:
+                                mp4_writer.close()
+                            except Exception:
+                                pass
+                            mp4_writer = None
+                    print(f"  Added: {year} ({img.size[0]}x{img.size[1]}) - {png_file.name}")
+            finally:
+                for writer in writers:
+                    writer.close()
+                if mp4_writer is not None:
+                    try:
+                        mp4_writer.close()
+                        mp4_written = mp4_frames > 0
+                    except Exception as e:
+                        print(f"MP4 finalize failed ({e}); GIFs are unaffected")
+
+            if not written:
+                print("No valid frames loaded")
+                return False
+        else:
+            # PIL path (also used for delta optimization, which needs
+            # every frame up front to build the shared palette)
+            frames = []
+            for year, png_file in year_files:
+                try:
+                    img = Image.open(png_file)
+                    # Convert to RGB if needed (for better GIF compatibility)
+                    if img.mode != 'RGB':
+                        img = img.convert('RGB')
+
+                    # Add year label to the image
+                    frames.append(add_year_label(img, year))
+
+                    print(f"  Loaded: {year} ({img.size[0]}x{img.size[1]}) - {png_file.name}")
+                except Exception as e:
+                    print(f"  Failed to load {png_file.name}: {e}")
+
+            if not frames:
+                print("No valid frames loaded")
+                return
+
+            if OPTIMIZE_DELTAS:
+                for path, duration in outputs:
+                    save_delta_optimized(frames, path, duration)
+            else:
+                # Quantize each frame to its GIF palette once; the three
+                # outputs differ only in duration, so the saves reuse the
+                # paletted frames instead of re-quantizing per file
+                pframes = [f.quantize(colors=256, dither=0) for f in frames]
+                for path, duration in outputs:
+                    pframes[0].save(
+                        path,
+                        save_all=True,
+                        append_images=pframes[1:],
+                        duration=duration,
+                        loop=0,  # infinite loop
+                        optimize=True
+                    )
+
         size_mb = output_gif.stat().st_size / 1024 / 1024
-        
+
         print(f"\nGIF created successfully!")
         print(f"File: {output_gif}")
         print(f"Size: {size_mb:.1f} MB")
         print(f"Shows glacier changes from {year_files[0][0]} to {year_files[-1][0]}")
-        
-        # Also create a faster version
-        fast_gif = Path(f"ala_archa_glacier_fast_{len(frames)}frames.gif")
-        frames[0].save(
-            fast_gif,
-            save_all=True,
-            append_images=frames[1:],
-            duration=500,  # faster - 500ms per frame
-            loop=0
-        )
-        
         print(f"\nAlso created fast version: {fast_gif}")
-        
-        # Create a slow detailed version for analysis
-        detailed_gif = Path(f"ala_archa_glacier_detailed_{len(frames)}frames.gif")
-        frames[0].save(
-            detailed_gif,
-            save_all=True,
-            append_images=frames[1:],
-            duration=1500,  # slower - 1.5 seconds per frame
-            loop=0
-        )
-        
         print(f"Also created detailed version: {detailed_gif}")
-        
+        if mp4_written:
+            print(f"Also created MP4 video: ala_archa_glacier_timelapse.mp4")
+
     except Exception as e:
         print(f"Error creating GIF: {e}")
 
+    return mp4_written
+
 def create_mp4_with_ffmpeg():
     """Alternative: Create MP4 video using FFmpeg"""
     
@@ -209,5 +317,7 @@ if __name__ == "__main__":
     print("Ala Archa Glacier Timelapse Creator")
     print("=" * 50)
     
-    create_glacier_gif()
-    create_mp4_with_ffmpeg()
\ No newline at end of file
+    mp4_done = create_glacier_gif()
+    if not mp4_done:
+        # Only show the manual FFmpeg recipe when no MP4 was produced
+        create_mp4_with_ffmpeg()
\ No newline at end of file
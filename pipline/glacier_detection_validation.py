@@ -5,14 +5,32 @@ Focus on actual glacier detection quality, not predictions
 """
 
 import numpy as np
+import matplotlib
+matplotlib.use('Agg')  # savefig-only script; skip GUI backend probing
 import matplotlib.pyplot as plt
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+import os
+import re
+
+# Let GDAL decompress GeoTIFF tiles on all cores (honors any value
+# the caller already exported)
+os.environ.setdefault('GDAL_NUM_THREADS', 'ALL_CPUS')
+
 import rasterio
 import rasterio.warp
 from scipy import ndimage
 import warnings
 warnings.filterwarnings('ignore')
 
+# Prefer OpenCV's SIMD morphology for the 2D mask cleanup; scipy's
+# generic N-d closing stays as the fallback
+try:
+    import cv2
+    CV2_AVAILABLE = True
+except ImportError:
+    CV2_AVAILABLE = False
+
 # Paths
 DATA_DIR = Path("out/satellite_data")
 OUTPUT_DIR = Path("out/glacier_detection_validation")
@@ -24,48 +42,47 @@ GLACIER_BOUNDS = {
     'min_lat': 42.45, 'max_lat': 42.6
 }
 
+# Compiled once: the parser runs per SAR file
+_SAR_YEAR_RE = re.compile(r'(20\d{2})\d{4}')
+
+# Built once: 2x2 closing kernels for per-year mask noise reduction
+_CLOSE_KERNEL_U8 = np.ones((2, 2), dtype=np.uint8)
+_CLOSE_KERNEL_BOOL = np.ones((2, 2), dtype=bool)
+
 def extract_year_from_sar_filename(filename):
     """Extract year from SAR filename"""
-    import re
-    match = re.search(r'(20\d{2})\d{4}', str(filename))
+    match = _SAR_YEAR_RE.search(str(filename))
     if match:
         return int(match.group(1))
     return None
 
-def crop_to_glacier_area(data, src_profile, bounds):
-    """Crop data to glacier area based on geographic bounds"""
+def glacier_window(src, bounds):
+    """Compute the pixel window covering the glacier bounds for a dataset"""
     from rasterio.warp import transform_bounds
     from rasterio.transform import rowcol
-    
+    from rasterio.windows import Window
+
     # Transform glacier bounds to image CRS
-    file_bounds = transform_bounds("EPSG:4326", src_profile['crs'], *bounds)
-    min_x, min_y, max_x, max_y = file_bounds
-    
+    min_x, min_y, max_x, max_y = transform_bounds("EPSG:4326", src.crs, *bounds)
+
     # Convert to pixel coordinates
-    transform = src_profile['transform']
-    min_row, min_col = rowcol(transform, min_x, max_y)  # top-left
-    max_row, max_col = rowcol(transform, max_x, min_y)  # bottom-right
-    
+    min_row, min_col = rowcol(src.transform, min_x, max_y)  # top-left
+    max_row, max_col = rowcol(src.transform, max_x, min_y)  # bottom-right
+
     # Ensure within image bounds
-    min_row, max_row = max(0, min_row), min(data.shape[0], max_row)
-    min_col, max_col = max(0, min_col), min(data.shape[1], max_col)
-    
-    # Crop data
-    cropped = data[min_row:max_row, min_col:max_col]
-    
-    # Update transform for cropped area
-    new_transform = src_profile['transform'] * rasterio.Affine.translation(min_col, min_row)
-    
-    return cropped, new_transform, (min_row, max_row, min_col, max_col)
+    min_row, max_row = max(0, min_row), min(src.height, max_row)
+    min_col, max_col = max(0, min_col), min(src.width, max_col)
+
+    return Window(min_col, min_row, max_col - min_col, max_row - min_row)
 
 def load_and_crop_sar():
     """Load and crop SAR data using same logic as working script"""
     import glob
-    
+
     # Find VV SAR files
     files = sorted(glob.glob(f"{DATA_DIR}/*_VV.tif"))
     print(f"📂 Found {len(files)} SAR files")
-    
+
     # Extract years
     file_years = []
     valid_files = []
@@ -74,55 +91,68 @@ def load_and_crop_sar():
         if year:
             file_years.append(year)
             valid_files.append(f)
-    
+
     # Sort by year
     sorted_data = sorted(zip(file_years, valid_files))
     years = [y for y, f in sorted_data]
     files = [f for y, f in sorted_data]
-    
+
     print(f"� Processing years: {years}")
-    
+
     # Convert bounds to tuple format
-    bounds_tuple = (GLACIER_BOUNDS['min_lon'], GLACIER_BOUNDS['min_lat'], 
+    bounds_tuple = (GLACIER_BOUNDS['min_lon'], GLACIER_BOUNDS['min_lat'],
                    GLACIER_BOUNDS['max_lon'], GLACIER_BOUNDS['max_lat'])
-    
-    # Load first file to get dimensions
+
+    # Preallocate the stack as soon as the crop size is known: the window
+    # comes from dataset metadata only (no pixels read), and each loader
+    # writes its slice in place, so there is no Python list of rasters
+    # that np.array would have to copy into a second full-size buffer.
+    if not files:
+        return np.empty((0, 0, 0), dtype=np.float32), years
     with rasterio.open(files[0]) as ds0:
-        full_data = ds0.read(1).astype("float32")
-        full_profile = ds0.profile
-        
-        # Crop to glacier area
-        cropped_sample, crop_transform, crop_coords = crop_to_glacier_area(
-            full_data, full_profile, bounds_tuple
-        )
-        
-        H, W = cropped_sample.shape
-        print(f"🎯 Cropped to glacier area: {W}x{H} pixels")
-    
-    # Load all cropped data
-    stack = []
+        w0 = glacier_window(ds0, bounds_tuple)
+    stack = np.empty((len(files), int(w0.height), int(w0.width)), dtype=np.float32)
+
+    # Load all cropped data. Reading through a window lets GDAL decode
+    # only the tiles that overlap the glacier area instead of pulling the
+    # whole scene into memory just to slice out a small crop.
+    def load_one(t, path):
+        with rasterio.open(path) as ds:
+            window = glacier_window(ds, bounds_tuple)
+            arr = ds.read(1, window=window).astype(np.float32, copy=False)
+
+            # Pixels outside the log10 domain plus nodata, in one mask
+            invalid = arr <= 0
+            if ds.nodata is not None:
+                invalid |= (arr == ds.nodata)
+            valid = ~invalid
+
+            # Convert to dB if needed (OPERA products are linear power),
+            # in place on the cropped array — no np.where temporaries
+            if valid.any() and np.max(arr[valid]) > 10:  # Likely linear scale
+                np.log10(arr, out=arr, where=valid)
+                arr *= 10.0
+                arr[invalid] = np.nan
+            elif ds.nodata is not None:
+                # Already in dB: only nodata becomes NaN
+                arr[arr == ds.nodata] = np.nan
+
+            stack[t] = arr
+
     for t, f in enumerate(files):
         print(f"📖 Loading {Path(f).name} ({years[t]})")
-        
-        with rasterio.open(f) as ds:
-            full_arr = ds.read(1).astype("float32")
-            
-            # Handle nodata
-            if ds.nodata is not None:
-                full_arr = np.where(full_arr == ds.nodata, np.nan, full_arr)
-            
-            # Convert to dB if needed (OPERA products are linear power)
-            valid_data = full_arr[~np.isnan(full_arr)]
-            if len(valid_data) > 0 and np.max(valid_data) > 10:  # Likely linear scale
-                full_arr = np.where(full_arr > 0, 10 * np.log10(full_arr), np.nan)
-            
-            # Crop to glacier area
-            cropped_data, _, _ = crop_to_glacier_area(full_arr, ds.profile, bounds_tuple)
-            stack.append(cropped_data)
-    
+
+    # The per-file work is dominated by disk reads and libtiff decode,
+    # both of which release the GIL, so threads overlap the file latency
+    with ThreadPoolExecutor(max_workers=min(8, len(files))) as pool:
+        list(pool.map(load_one, range(len(files)), files))
+
+    H, W = stack.shape[1:]
+    print(f"🎯 Cropped to glacier area: {W}x{H} pixels")
+
     print(f"✅ Loaded {len(stack)} SAR images")
-    
-    return np.array(stack), years
+
+    return stack, years
 
 def detect_glacier_multilevel(sar_data, year):
     """
@@ -131,66 +161,97 @@ def detect_glacier_multilevel(sar_data, year):
     """
     x = sar_data.copy()
     valid = np.isfinite(x)
-    
-    if np.sum(valid) == 0:
-        return None, None, None, None
-    
+    total_pixels = int(valid.sum())
+
+    if total_pixels == 0:
+        return None, None, None, None, None, None, None, None
+
+    # 3-Level Glacier Classification: one quantile call sorts the valid
+    # pixels once for all three thresholds plus the display stretch, and
+    # a single digitize pass buckets every pixel instead of three
+    # full-array comparisons. The histogram is computed here too so the
+    # visualization never re-scans the raster.
+    valid_values = x[valid]
+    data_min = float(valid_values.min())
+    data_max = float(valid_values.max())
     print(f"\n🔍 Analyzing {year}:")
-    print(f"    SAR range: {np.nanmin(x):.2f} to {np.nanmax(x):.2f} dB")
-    
-    # 3-Level Glacier Classification
-    level3_th = np.percentile(x[valid], 12)   # Deep blue areas (darkest)
-    level2_th = np.percentile(x[valid], 25)   # Green areas (medium)
-    level1_th = np.percentile(x[valid], 40)   # Yellow areas (lightest)
-    
-    # Create individual level masks
-    level3_mask = (x <= level3_th) & valid    # Deep blue glaciers
-    level2_mask = (x <= level2_th) & valid    # Green glaciers
-    level1_mask = (x <= level1_th) & valid    # Yellow glaciers
+    print(f"    SAR range: {data_min:.2f} to {data_max:.2f} dB")
+
+    vmin, level3_th, level2_th, level1_th, vmax = np.quantile(
+        valid_values, [0.02, 0.12, 0.25, 0.40, 0.98])
+    hist, bin_edges = np.histogram(valid_values, bins=50, density=True)
+
+    # Create individual level masks (bucket k means x <= thresholds[k])
+    bucket = np.digitize(x, [level3_th, level2_th, level1_th], right=True)
+    level3_mask = valid & (bucket == 0)    # Deep blue glaciers
+    level2_mask = valid & (bucket <= 1)    # Green glaciers
+    level1_mask = valid & (bucket <= 2)    # Yellow glaciers
     
     # Noise reduction
-    kernel = np.ones((2,2), dtype=bool)
-    level3_mask = ndimage.binary_closing(level3_mask, structure=kernel)
-    level2_mask = ndimage.binary_closing(level2_mask, structure=kernel)
-    level1_mask = ndimage.binary_closing(level1_mask, structure=kernel)
+    if CV2_AVAILABLE:
+        level3_mask = cv2.morphologyEx(level3_mask.astype(np.uint8), cv2.MORPH_CLOSE, _CLOSE_KERNEL_U8).astype(bool)
+        level2_mask = cv2.morphologyEx(level2_mask.astype(np.uint8), cv2.MORPH_CLOSE, _CLOSE_KERNEL_U8).astype(bool)
+        level1_mask = cv2.morphologyEx(level1_mask.astype(np.uint8), cv2.MORPH_CLOSE, _CLOSE_KERNEL_U8).astype(bool)
+    else:
+        level3_mask = ndimage.binary_closing(level3_mask, structure=_CLOSE_KERNEL_BOOL)
+        level2_mask = ndimage.binary_closing(level2_mask, structure=_CLOSE_KERNEL_BOOL)
+        level1_mask = ndimage.binary_closing(level1_mask, structure=_CLOSE_KERNEL_BOOL)
     
     # Combined mask
     combined_mask = level1_mask  # Includes all levels
     
     # Statistics
     level3_count = np.sum(level3_mask)
-    level2_count = np.sum(level2_mask) 
+    level2_count = np.sum(level2_mask)
     level1_count = np.sum(level1_mask)
-    total_pixels = np.sum(valid)
-    
+
     print(f"    Level 3 (Deep Blue): {level3_count} pixels ({level3_th:.2f} dB) - {level3_count/total_pixels*100:.1f}%")
     print(f"    Level 2 (Green): {level2_count} pixels ({level2_th:.2f} dB) - {level2_count/total_pixels*100:.1f}%") 
     print(f"    Level 1 (Yellow): {level1_count} pixels ({level1_th:.2f} dB) - {level1_count/total_pixels*100:.1f}%")
     print(f"    Total Glacier: {level1_count} pixels ({level1_count/total_pixels*100:.1f}%)")
     
-    return level3_mask, level2_mask, level1_mask, combined_mask
+    return (level3_mask, level2_mask, level1_mask, combined_mask,
+            (level3_th, level2_th, level1_th), (vmin, vmax), (hist, bin_edges),
+            (data_min, data_max))
 
-def create_detection_visualization(sar_img, level3_mask, level2_mask, level1_mask, combined_mask, year, save_path):
-    """Create comprehensive detection visualization"""
-    
-    fig, axes = plt.subplots(2, 3, figsize=(18, 12))
+def create_detection_visualization(fig, axes, sar_img, level3_mask, level2_mask, level1_mask,
+                                   combined_mask, thresholds, vlim, hist_data, data_range,
+                                   year, save_path):
+    """Create comprehensive detection visualization.
+
+    Thresholds, display stretch, histogram and data range come
+    precomputed from detect_glacier_multilevel so the raster is not
+    re-scanned here. The figure and axes are created once by the caller
+    and cleared here, so matplotlib does not rebuild the 2x3 layout for
+    every year."""
+    level3_th, level2_th, level1_th = thresholds
+    vmin, vmax = vlim
+    hist, bin_edges = hist_data
+    data_min, data_max = data_range
+
+    # Render the image panels at half resolution: imshow rasterizes the
+    # full array six times otherwise, and at dpi=150 the extra detail is
+    # below the output pixel budget. The masks are strided identically
+    # so the overlays stay aligned; all statistics remain full-res.
+    sar_small = sar_img[::2, ::2]
+    l3_small = level3_mask[::2, ::2]
+    l2_small = level2_mask[::2, ::2]
+    l1_small = level1_mask[::2, ::2]
+    combined_small = combined_mask[::2, ::2]
+
+    for ax in axes.flat:
+        ax.clear()
     fig.suptitle(f'Glacier Detection Analysis - {year}', fontsize=16, fontweight='bold')
-    
+
     # 1. Original SAR image with good contrast
-    valid_data = sar_img[np.isfinite(sar_img)]
-    vmin, vmax = np.percentile(valid_data, [2, 98])
-    
-    im1 = axes[0,0].imshow(sar_img, cmap='gray', vmin=vmin, vmax=vmax)
-    axes[0,0].set_title(f'Original SAR Image {year}\nRange: {np.nanmin(sar_img):.1f} to {np.nanmax(sar_img):.1f} dB')
+    im1 = axes[0,0].imshow(sar_small, cmap='gray', vmin=vmin, vmax=vmax)
+    axes[0,0].set_title(f'Original SAR Image {year}\nRange: {data_min:.1f} to {data_max:.1f} dB')
     axes[0,0].axis('off')
-    plt.colorbar(im1, ax=axes[0,0], fraction=0.046, pad=0.04)
-    
-    # 2. SAR histogram with thresholds
-    axes[0,1].hist(valid_data, bins=50, alpha=0.7, color='lightblue', density=True)
-    level3_th = np.percentile(valid_data, 12)
-    level2_th = np.percentile(valid_data, 25) 
-    level1_th = np.percentile(valid_data, 40)
-    
+    cbar = fig.colorbar(im1, ax=axes[0,0], fraction=0.046, pad=0.04)
+
+    # 2. SAR histogram with thresholds (prebinned in the detector)
+    axes[0,1].stairs(hist, bin_edges, fill=True, alpha=0.7, color='lightblue')
+
     axes[0,1].axvline(level3_th, color='darkblue', linestyle='--', linewidth=2, label=f'Level 3: {level3_th:.1f} dB')
     axes[0,1].axvline(level2_th, color='green', linestyle='--', linewidth=2, label=f'Level 2: {level2_th:.1f} dB')
     axes[0,1].axvline(level1_th, color='gold', linestyle='--', linewidth=2, label=f'Level 1: {level1_th:.1f} dB')
@@ -202,46 +263,48 @@ def create_detection_visualization(sar_img, level3_mask, level2_mask, level1_mas
     axes[0,1].grid(True, alpha=0.3)
     
     # 3. Multi-level detection overlay
-    axes[0,2].imshow(sar_img, cmap='gray', vmin=vmin, vmax=vmax, alpha=0.7)
-    
+    axes[0,2].imshow(sar_small, cmap='gray', vmin=vmin, vmax=vmax, alpha=0.7)
+
     # Create colored overlay for each level
-    overlay = np.zeros((*sar_img.shape, 3))
-    overlay[level3_mask] = [0, 0, 0.8]      # Deep blue for level 3
-    overlay[level2_mask & ~level3_mask] = [0, 0.8, 0]  # Green for level 2 only
-    overlay[level1_mask & ~level2_mask] = [0.8, 0.8, 0]  # Yellow for level 1 only
+    overlay = np.zeros((*sar_small.shape, 3))
+    overlay[l3_small] = [0, 0, 0.8]      # Deep blue for level 3
+    overlay[l2_small & ~l3_small] = [0, 0.8, 0]  # Green for level 2 only
+    overlay[l1_small & ~l2_small] = [0.8, 0.8, 0]  # Yellow for level 1 only
     
     axes[0,2].imshow(overlay, alpha=0.6)
     axes[0,2].set_title('Multi-Level Detection Overlay\nBlue=L3, Green=L2, Yellow=L1')
     axes[0,2].axis('off')
     
     # 4. Level 3 Detection (Deep Blue - Darkest glaciers)
-    detection_display = np.zeros_like(sar_img)
-    detection_display[level3_mask] = 1
-    axes[1,0].imshow(sar_img, cmap='gray', vmin=vmin, vmax=vmax, alpha=0.6)
+    detection_display = np.zeros_like(sar_small)
+    detection_display[l3_small] = 1
+    axes[1,0].imshow(sar_small, cmap='gray', vmin=vmin, vmax=vmax, alpha=0.6)
     axes[1,0].imshow(detection_display, cmap='Blues', alpha=0.8, vmin=0, vmax=1)
     axes[1,0].set_title(f'Level 3: Deep Blue Areas\n{np.sum(level3_mask)} pixels ({np.sum(level3_mask)/level3_mask.size*100:.1f}%)')
     axes[1,0].axis('off')
     
-    # 5. Level 2 Detection (Green - Medium glaciers)  
-    detection_display = np.zeros_like(sar_img)
-    detection_display[level2_mask] = 1
-    axes[1,1].imshow(sar_img, cmap='gray', vmin=vmin, vmax=vmax, alpha=0.6)
+    # 5. Level 2 Detection (Green - Medium glaciers)
+    detection_display = np.zeros_like(sar_small)
+    detection_display[l2_small] = 1
+    axes[1,1].imshow(sar_small, cmap='gray', vmin=vmin, vmax=vmax, alpha=0.6)
     axes[1,1].imshow(detection_display, cmap='Greens', alpha=0.8, vmin=0, vmax=1)
     axes[1,1].set_title(f'Level 2: Green Areas\n{np.sum(level2_mask)} pixels ({np.sum(level2_mask)/level2_mask.size*100:.1f}%)')
     axes[1,1].axis('off')
     
     # 6. Complete glacier detection
-    detection_display = np.zeros_like(sar_img)
-    detection_display[combined_mask] = 1
-    axes[1,2].imshow(sar_img, cmap='gray', vmin=vmin, vmax=vmax, alpha=0.6)
+    detection_display = np.zeros_like(sar_small)
+    detection_display[combined_small] = 1
+    axes[1,2].imshow(sar_small, cmap='gray', vmin=vmin, vmax=vmax, alpha=0.6)
     axes[1,2].imshow(detection_display, cmap='Reds', alpha=0.8, vmin=0, vmax=1)
     axes[1,2].set_title(f'Complete Glacier Detection\n{np.sum(combined_mask)} pixels ({np.sum(combined_mask)/combined_mask.size*100:.1f}%)')
     axes[1,2].axis('off')
     
-    plt.tight_layout()
-    plt.savefig(save_path, dpi=150, bbox_inches='tight', facecolor='white')
-    plt.close()
-    
+    fig.tight_layout()
+    fig.savefig(save_path, dpi=150, bbox_inches='tight', facecolor='white')
+    # Removing the colorbar gives axes[0,0] its stolen space back for
+    # the next year's pass
+    cbar.remove()
+
     print(f"    💾 Saved detection analysis: {save_path.name}")
 
 def main():
@@ -253,7 +316,10 @@ def main():
     stack, years = load_and_crop_sar()
     
     print(f"\n🎭 Analyzing glacier detection for {len(years)} years...")
-    
+
+    # One figure reused for every year; cleared per pass, closed once
+    fig, axes = plt.subplots(2, 3, figsize=(18, 12))
+
     # Process each year
     for i, year in enumerate(years):
         print(f"\n{'='*60}")
@@ -263,16 +329,19 @@ def main():
         sar_img = stack[i]
         
         # Detect glaciers
-        level3_mask, level2_mask, level1_mask, combined_mask = detect_glacier_multilevel(sar_img, year)
-        
+        (level3_mask, level2_mask, level1_mask, combined_mask,
+         thresholds, vlim, hist_data, data_range) = detect_glacier_multilevel(sar_img, year)
+
         if combined_mask is not None:
-            # Create visualization 
+            # Create visualization
             save_path = OUTPUT_DIR / f"glacier_detection_{year}.png"
             create_detection_visualization(
-                sar_img, level3_mask, level2_mask, level1_mask, combined_mask, 
-                year, save_path
+                fig, axes, sar_img, level3_mask, level2_mask, level1_mask,
+                combined_mask, thresholds, vlim, hist_data, data_range, year, save_path
             )
-    
+
+    plt.close(fig)
+
     print(f"\n🎉 Glacier Detection Validation Complete!")
     print(f"📁 Output directory: {OUTPUT_DIR}")
     print(f"📊 Generated {len(years)} detection analysis images")
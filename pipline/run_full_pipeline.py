@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Full SAR Pipeline Runner
+Runs the download -> frames -> crop -> analysis -> gif stages in order
+"""
+
+import importlib
+import logging
+import subprocess
+import sys
+from importlib.util import find_spec
+
+logger = logging.getLogger(__name__)
+
+# Import names of the packages the stages actually import at module
+# level (kept in sync with requirements.txt)
+REQUIRED_MODULES = [
+    "rasterio",
+    "PIL",
+    "numpy",
+    "yaml",
+    "requests",
+    "tqdm",
+    "matplotlib",
+    "scipy",
+    "pandas",
+    "cv2",
+]
+
+
+def check_dependencies():
+    """Report missing stage dependencies without importing them.
+
+    find_spec only resolves the module on disk — no top-level code or C
+    extensions run, so this stays in milliseconds where importing
+    rasterio/scipy/matplotlib costs seconds.
+    """
+    missing = [m for m in REQUIRED_MODULES if find_spec(m) is None]
+    if missing:
+        logger.error("Missing dependencies: %s", ", ".join(missing))
+        logger.error("Install with: pip install -r requirements.txt")
+    return not missing
+
+# Pipeline stages in execution order: (module, entry function, description)
+STAGES = [
+    ("sar_download_satellite_data", "download_vv_geotiffs", "Download Sentinel-1 OPERA products"),
+    ("sar_generate_frames", "generate_frames", "Generate PNG frames from VV GeoTIFFs"),
+    ("sar_crop_frames_to_glacier_from_satellite_data", "main", "Crop frames to glacier area"),
+    ("sar_db_distribution_analysis", "analyze_db_distribution_multilevel", "6-level dB distribution analysis"),
+    ("create_glacier_gif", "create_glacier_gif", "Create glacier timelapse GIFs"),
+]
+
+
+def run_stage(module_name, entry_name, description):
+    """Run one pipeline stage in-process, returns True on success.
+
+    Importing the stage module and calling its entry function keeps the
+    interpreter (and the numpy/rasterio/matplotlib imports) warm across
+    stages instead of paying a cold python start per script. Falls back
+    to a subprocess if the module cannot be imported directly.
+    """
+    logger.info("Running: %s (%s)", description, module_name)
+    try:
+        module = importlib.import_module(module_name)
+        getattr(module, entry_name)()
+        return True
+    except ImportError:
+        logger.warning("Could not import %s; running as subprocess", module_name)
+        result = subprocess.run([sys.executable, f"{module_name}.py"])
+        if result.returncode != 0:
+            logger.error("Stage failed: %s (exit code %d)", module_name, result.returncode)
+            return False
+        return True
+    except Exception:
+        logger.exception("Stage failed: %s", module_name)
+        return False
+
+
+def main():
+    logger.info("Full SAR Pipeline")
+    logger.info("=" * 50)
+
+    if not check_dependencies():
+        return 1
+
+    results = []
+    for module_name, entry_name, description in STAGES:
+        ok = run_stage(module_name, entry_name, description)
+        results.append((module_name, ok))
+        if not ok:
+            logger.error("Stopping pipeline: later stages depend on %s", module_name)
+            break
+
+    # One composed message -> one stdout write instead of a line per stage
+    summary = "\n".join(
+        ["", "Pipeline summary:"]
+        + [f"  {'OK  ' if ok else 'FAIL'} {module_name}" for module_name, ok in results]
+    )
+    logger.info("%s", summary)
+
+    return 0 if all(ok for _, ok in results) else 1
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    sys.exit(main())
@@ -6,18 +6,40 @@ Uses glacier_area coordinates from config.yaml
 """
 
 import yaml
+from functools import lru_cache
+
+# Use the libyaml C loader when available; it parses config.yaml an
+# order of magnitude faster than the pure-Python SafeLoader
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
 import numpy as np
 from pathlib import Path
 from tqdm import tqdm
+import os
+
+# Let GDAL decompress GeoTIFF tiles on all cores (honors any value
+# the caller already exported)
+os.environ.setdefault('GDAL_NUM_THREADS', 'ALL_CPUS')
+
 import rasterio
 from rasterio.windows import from_bounds
 from rasterio.warp import transform_bounds
-from PIL import Image
+import cv2
 import re
 
+@lru_cache(maxsize=1)
 def load_config():
     with open('config.yaml', 'r') as f:
-        return yaml.safe_load(f)
+        return yaml.load(f, Loader=_YAML_LOADER)
+
+@lru_cache(maxsize=32)
+def bounds_to_crs(dst_crs, min_lon, min_lat, max_lon, max_lat):
+    """Reproject a WGS84 bbox into dst_crs, cached per (crs, bbox).
+
+    Every TIF in a series shares the same CRS and the same config areas,
+    so the pyproj transform only runs once per unique combination instead
+    of once per file per area.
+    """
+    return transform_bounds("EPSG:4326", dst_crs, min_lon, min_lat, max_lon, max_lat)
 
 def parse_date_from_name(filename):
     m = re.search(r'_(20\d{6})T', filename)
@@ -29,24 +51,29 @@ def parse_date_from_name(filename):
 def adaptive_linear_stretch(arr, percentile_range=(10, 90)):
     valid_data = arr[~np.isnan(arr)]
     if len(valid_data) == 0:
-        return (arr * 0).astype(np.uint8)
-    
-    # Use less aggressive stretch to avoid brightness
-    low_val = np.percentile(valid_data, percentile_range[0])
-    high_val = np.percentile(valid_data, percentile_range[1])
-    
+        return np.zeros(arr.shape, dtype=np.uint8)
+
+    # Use less aggressive stretch to avoid brightness; both percentiles
+    # come from one internal sort instead of two
+    low_val, high_val = np.percentile(valid_data, percentile_range)
+
     if high_val - low_val < 0.1:
         low_val = np.min(valid_data)
         high_val = np.max(valid_data)
         if high_val - low_val < 0.1:
             high_val = low_val + 1.0
-    
-    stretched = np.clip((arr - low_val) / (high_val - low_val), 0, 1)
-    return (stretched * 255).astype(np.uint8)
 
-def crop_and_combine_areas(tif_file, glacier_areas, output_file):
+    # Fused scale/clip pipeline on a single working buffer: subtract,
+    # multiply and clip all write in place, so only one float temporary
+    # exists before the uint8 cast
+    stretched = arr - low_val
+    stretched *= 255.0 / (high_val - low_val)
+    np.clip(stretched, 0, 255, out=stretched)
+    return stretched.astype(np.uint8)
+
+def crop_and_combine_areas(tif_file, glacier_areas, output_file, output_format='png'):
     """Crop multiple coordinate boxes and combine into one image"""
-    
+
     try:
         with rasterio.open(tif_file) as src:
             area_crops = []
@@ -56,26 +83,31 @@ def crop_and_combine_areas(tif_file, glacier_areas, output_file):
                 min_lon, min_lat = area['min_lon'], area['min_lat']
                 max_lon, max_lat = area['max_lon'], area['max_lat']
                 
-                bbox_utm = transform_bounds("EPSG:4326", src.crs, min_lon, min_lat, max_lon, max_lat)
+                bbox_utm = bounds_to_crs(src.crs.to_string(), min_lon, min_lat, max_lon, max_lat)
                 window = from_bounds(*bbox_utm, src.transform)
                 
                 if window.width <= 0 or window.height <= 0:
                     continue
                 
-                vv_data = src.read(1, window=window)
+                # Masked read folds the nodata handling into the window
+                # read itself and keeps the crop in float32 end to end —
+                # no full-size float64 np.where copy
+                vv_data = src.read(1, window=window, masked=True,
+                                   out_dtype=np.float32).filled(np.nan)
                 if vv_data.size == 0:
                     continue
-                
-                if src.nodata is not None:
-                    vv_data = np.where(vv_data == src.nodata, np.nan, vv_data)
-                
+
                 if not np.any(~np.isnan(vv_data)):
                     continue
-                
-                # Convert to dB if needed
-                valid_data = vv_data[~np.isnan(vv_data)]
-                if len(valid_data) > 0 and np.max(valid_data) > 10:
-                    vv_data = np.where(vv_data > 0, 10 * np.log10(vv_data), np.nan)
+
+                # Convert to dB if needed: where= fuses the positivity
+                # test and the log into one pass over a NaN-prefilled
+                # buffer (NaN pixels fail the test and stay NaN)
+                if np.nanmax(vv_data) > 10:
+                    db_data = np.full_like(vv_data, np.nan)
+                    np.log10(vv_data, out=db_data, where=vv_data > 0)
+                    db_data *= 10.0
+                    vv_data = db_data
                 
                 # Fill NaN and apply adaptive stretch
                 min_valid = np.nanmin(vv_data)
@@ -106,7 +138,14 @@ def crop_and_combine_areas(tif_file, glacier_areas, output_file):
                     combined_frame[:h, x_offset:x_offset+w] = crop
                     x_offset += w
             
-            Image.fromarray(combined_frame, mode='L').save(output_file)
+            # cv2.imwrite encodes the contiguous uint8 frame several
+            # times faster than Pillow; PNG compression level 1 keeps
+            # the output lossless while skipping zlib's slow settings
+            if output_format == 'jpg':
+                params = [cv2.IMWRITE_JPEG_QUALITY, 92]
+            else:
+                params = [cv2.IMWRITE_PNG_COMPRESSION, 1]
+            cv2.imwrite(str(output_file), combined_frame, params)
             return True
             
     except Exception:
@@ -115,7 +154,10 @@ def crop_and_combine_areas(tif_file, glacier_areas, output_file):
 def main():
     config = load_config()
     glacier_areas = config['area']['glacier_areas']
-    
+
+    # 'png' (lossless, default) or 'jpg' (much faster to encode, lossy)
+    output_format = str(config['processing'].get('crop_output_format', 'png')).lower()
+
     tif_dir = Path(config['directories']['satellite_data'])
     output_dir = Path("out/glacier_aoi")
     output_dir.mkdir(parents=True, exist_ok=True)
@@ -131,12 +173,12 @@ def main():
         if not date_str:
             continue
             
-        png_file = output_dir / f"{date_str}.png"
+        png_file = output_dir / f"{date_str}.{output_format}"
         if png_file.exists():
             successful += 1
             continue
-            
-        if crop_and_combine_areas(tif_file, glacier_areas, png_file):
+
+        if crop_and_combine_areas(tif_file, glacier_areas, png_file, output_format):
             successful += 1
     
     print(f"Created {successful} glacier cropped frames in {output_dir}")
@@ -5,19 +5,31 @@ Crops glacier areas from processed PNG frames and adds coordinate grid overlay
 """
 
 import yaml
+from functools import lru_cache
+
+# Use the libyaml C loader when available; it parses config.yaml an
+# order of magnitude faster than the pure-Python SafeLoader
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
 import numpy as np
 from pathlib import Path
 from tqdm import tqdm
 from PIL import Image, ImageDraw, ImageFont
+import os
+
+# Let GDAL decompress GeoTIFF tiles on all cores (honors any value
+# the caller already exported)
+os.environ.setdefault('GDAL_NUM_THREADS', 'ALL_CPUS')
+
 import rasterio
 from rasterio.warp import transform_bounds
 from rasterio.transform import rowcol
 import re
 
+@lru_cache(maxsize=1)
 def load_config():
     """Load configuration from YAML file"""
     with open('config.yaml', 'r') as f:
-        return yaml.safe_load(f)
+        return yaml.load(f, Loader=_YAML_LOADER)
 
 def parse_date_from_name(filename):
     """Extract date from filename in YYYY-MM-DD format"""
@@ -5,16 +5,31 @@ Downloads VV.tif files directly using known product names and URLs
 No placeholders needed - just downloads the actual GeoTIFF files
 """
 
+import sys
 import yaml
+from functools import lru_cache
+
+# Use the libyaml C loader when available; it parses config.yaml an
+# order of magnitude faster than the pure-Python SafeLoader
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
 import requests
 import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from tqdm import tqdm
 
 # Load configuration
+@lru_cache(maxsize=1)
 def load_config():
     with open('config.yaml', 'r') as f:
-        return yaml.safe_load(f)
+        return yaml.load(f, Loader=_YAML_LOADER)
+
+# One shared session with a pooled HTTP adapter: keep-alive reuses the
+# TCP+TLS connection across files (and across the download threads)
+# instead of paying the handshake cost per request.
+SESSION = requests.Session()
+_adapter = requests.adapters.HTTPAdapter(pool_connections=16, pool_maxsize=16, max_retries=3)
+SESSION.mount('https://', _adapter)
 
 KNOWN_PRODUCTS = [
     # Frame 228503 - Complete glacier coverage (August time series 2016-2025)
@@ -30,54 +45,75 @@ KNOWN_PRODUCTS = [
     "OPERA_L2_RTC-S1_T107-228503-IW3_20250828T010514Z_20250828T085403Z_S1A_30_v1.0",  # Aug 28, 2025
 ]
 
+def download_product(product_name, tif_dir):
+    """Download a single VV GeoTIFF. Returns (product_name, ok, message)."""
+
+    # Construct direct URL to VV.tif file
+    vv_url = f"https://cumulus.asf.earthdatacloud.nasa.gov/OPERA/OPERA_L2_RTC-S1/{product_name}/{product_name}_VV.tif"
+
+    # Output file path
+    vv_file = tif_dir / f"{product_name}_VV.tif"
+
+    # Skip if already downloaded
+    if vv_file.exists():
+        return product_name, True, None
+
+    # Large chunks mean far fewer Python-level loop iterations and write
+    # calls per file; configurable so slow links can dial it back
+    chunk_size = load_config().get('download', {}).get('chunk_size', 1024 * 1024)
+
+    try:
+        # Download with authentication (uses ~/.netrc automatically)
+        response = SESSION.get(vv_url, stream=True, timeout=30)
+
+        if response.status_code == 200:
+            with open(vv_file, 'wb') as f:
+                for chunk in response.iter_content(chunk_size=chunk_size):
+                    if chunk:
+                        f.write(chunk)
+
+            return product_name, True, None
+
+        return product_name, False, f"Failed to download (HTTP {response.status_code}): {product_name}"
+
+    except Exception as e:
+        return product_name, False, f"Download error for {product_name}: {e}"
+
 def download_vv_geotiffs():
     """Download VV GeoTIFF files directly"""
-    
+
     config = load_config()
     tif_dir = Path(config['directories']['satellite_data'])
     tif_dir.mkdir(parents=True, exist_ok=True)
-    
+
     print(f"VV GeoTIFF Downloader")
     print(f"Downloading {len(KNOWN_PRODUCTS)} VV.tif files...")
     print(f"Frame 228503 time series: 2016-2025 (complete glacier coverage)")
     print(f"Additional July products: 2020, 2025")
     print(f"Output directory: {tif_dir}")
     print()
-    
+
     downloaded_count = 0
-    
-    for product_name in tqdm(KNOWN_PRODUCTS, desc="Downloading VV.tif files"):
-        
-        # Construct direct URL to VV.tif file
-        vv_url = f"https://cumulus.asf.earthdatacloud.nasa.gov/OPERA/OPERA_L2_RTC-S1/{product_name}/{product_name}_VV.tif"
-        
-        # Output file path
-        vv_file = tif_dir / f"{product_name}_VV.tif"
-        
-        # Skip if already downloaded
-        if vv_file.exists():
-            downloaded_count += 1
-            continue
-        
-        try:
-            # Download with authentication (uses ~/.netrc automatically)
-            response = requests.get(vv_url, stream=True, timeout=30)
-            
-            if response.status_code == 200:
-                with open(vv_file, 'wb') as f:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        if chunk:
-                            f.write(chunk)
-                
+    failures = []
+
+    # Each file is an independent HTTPS transfer, so run a few in parallel
+    # to overlap network latency instead of waiting on one stream at a time
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [pool.submit(download_product, name, tif_dir) for name in KNOWN_PRODUCTS]
+
+        for future in tqdm(as_completed(futures), total=len(futures), desc="Downloading VV.tif files"):
+            _, ok, message = future.result()
+            if ok:
                 downloaded_count += 1
-                
-            else:
-                print(f"  Failed to download (HTTP {response.status_code}): {product_name}")
-                
-        except Exception as e:
-            print(f"  Download error for {product_name}: {e}")
-            continue
-    
+            elif message:
+                failures.append(message)
+
+    # Report failures in one write after the loop: interleaving prints with
+    # the tqdm bar forces a redraw (and an extra flush) per message
+    if failures:
+        sys.stdout.write("".join(f"  {message}\n" for message in failures))
+        sys.stdout.flush()
+
     print(f"\nSuccessfully downloaded {downloaded_count} VV.tif files!")
     print(f"Files saved in: {tif_dir}")
     print(f"\nNext step: python generate_frames.py")
@@ -5,11 +5,23 @@ Processes downloaded VV.tif files and creates PNG frames with proper contrast
 """
 
 import yaml
+from functools import lru_cache
+
+# Use the libyaml C loader when available; it parses config.yaml an
+# order of magnitude faster than the pure-Python SafeLoader
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
 import numpy as np
+import os
 import re
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from pathlib import Path
 from tqdm import tqdm
 
+# Let GDAL decompress GeoTIFF tiles on all cores (honors any value
+# the caller already exported)
+os.environ.setdefault('GDAL_NUM_THREADS', 'ALL_CPUS')
+
 try:
     import rasterio
     from PIL import Image
@@ -18,18 +30,34 @@ except ImportError as e:
     print("Install with: pip install rasterio Pillow")
     exit(1)
 
+@lru_cache(maxsize=1)
 def load_config():
     """Load configuration from YAML file"""
     with open('config.yaml', 'r') as f:
-        return yaml.safe_load(f)
+        return yaml.load(f, Loader=_YAML_LOADER)
+
+# Lookup table mapping every possible 16-bit amplitude to its dB value.
+# Built lazily on first use: for integer rasters a single fancy-index
+# replaces millions of per-pixel log10 evaluations.
+_DB_LUT = None
+
+def _db_lut():
+    global _DB_LUT
+    if _DB_LUT is None:
+        _DB_LUT = (10.0 * np.log10(np.arange(65536, dtype=np.float64) + 1e-10)).astype(np.float32)
+    return _DB_LUT
 
 def linear_stretch_db(arr, lo, hi):
     """Apply linear stretch to dB values for visualization"""
     arr = np.clip((arr - lo) / (hi - lo), 0, 1)
     return (arr * 255).astype(np.uint8)
 
+@lru_cache(maxsize=256)
 def parse_date_from_name(filename):
-    """Extract date from OPERA filename in YYYY-MM-DD format"""
+    """Extract date from OPERA filename in YYYY-MM-DD format.
+
+    Cached because the main loop parses each filename once for the
+    conversion and again for the progress message."""
     # Look for pattern like 20200607T010505 in filename
     m = re.search(r'_(20\d{6})T', filename)
     if m:
@@ -56,18 +84,31 @@ def process_vv_tif_to_png(tif_file, output_dir, db_range):
     try:
         with rasterio.open(tif_file) as src:
             # Read VV data (first band)
-            vv_data = src.read(1)
-            
-            # Handle no-data values
-            if src.nodata is not None:
-                vv_data = np.where(vv_data == src.nodata, np.nan, vv_data)
-            
-            # Convert to dB if not already (OPERA RTC products are in linear power scale)
-            if np.nanmax(vv_data) > 10:  # Likely linear scale
-                vv_data = 10 * np.log10(np.maximum(vv_data, 1e-10))
-            
-            # Replace NaN with minimum dB for display
-            vv_data = np.where(np.isnan(vv_data), db_range[0], vv_data)
+            raw = src.read(1)
+
+            if raw.dtype in (np.uint8, np.uint16):
+                # Integer amplitudes span at most 65536 values, so the dB
+                # conversion collapses to a table lookup
+                vv_data = _db_lut()[raw]
+                if src.nodata is not None:
+                    vv_data[raw == int(src.nodata)] = db_range[0]
+            else:
+                # float32 so every step below can run in place — no
+                # float64 temporaries for a frame-sized array
+                vv_data = raw.astype(np.float32)
+
+                # Handle no-data values
+                if src.nodata is not None:
+                    vv_data[vv_data == src.nodata] = np.nan
+
+                # Convert to dB if not already (OPERA RTC products are in linear power scale)
+                if np.nanmax(vv_data) > 10:  # Likely linear scale
+                    np.maximum(vv_data, 1e-10, out=vv_data)
+                    np.log10(vv_data, out=vv_data)
+                    vv_data *= 10.0
+
+                # Replace NaN with minimum dB for display
+                np.nan_to_num(vv_data, copy=False, nan=db_range[0])
             
             # Apply your original dB stretch
             frame = linear_stretch_db(vv_data, db_range[0], db_range[1])
@@ -112,15 +153,23 @@ def generate_frames():
     print(f"Found {len(vv_files)} VV.tif files")
     
     successful_frames = 0
-    
-    for tif_file in tqdm(sorted(vv_files), desc="Creating PNG frames"):
-        if process_vv_tif_to_png(tif_file, frames_dir, db_range):
-            successful_frames += 1
-            
-            # Show progress for first few
-            if successful_frames <= 3:
-                date_str = parse_date_from_name(tif_file.name)
-                print(f"  Created: {date_str}.png")
+
+    # Each TIF is independent (read, log10, stretch, save), so fan the
+    # work out across processes; the conversion is CPU-bound enough that
+    # threads would fight over the GIL for the NumPy bookkeeping
+    vv_files = sorted(vv_files)
+    worker = partial(process_vv_tif_to_png, output_dir=frames_dir, db_range=db_range)
+    with ProcessPoolExecutor(max_workers=min(os.cpu_count() or 1, len(vv_files))) as pool:
+        for tif_file, ok in zip(vv_files, tqdm(pool.map(worker, vv_files),
+                                               total=len(vv_files),
+                                               desc="Creating PNG frames")):
+            if ok:
+                successful_frames += 1
+
+                # Show progress for first few
+                if successful_frames <= 3:
+                    date_str = parse_date_from_name(tif_file.name)
+                    print(f"  Created: {date_str}.png")
     
     print(f"\nSuccessfully created {successful_frames} PNG frames!")
     print(f"Frames saved in: {frames_dir}")
@@ -1,4 +1,6 @@
 import numpy as np
+import matplotlib
+matplotlib.use('Agg')  # savefig-only script; skip GUI backend probing
 import matplotlib.pyplot as plt
 from PIL import Image
 from sklearn.linear_model import LinearRegression
@@ -161,6 +163,11 @@ class GlacierPredictor:
         reference_img = self.images[-1].copy()
         reference_year = self.years[-1]
 
+        # One modern PCG64 generator for all the texture noise below: faster
+        # than the legacy global Mersenne Twister, lock-free, and seeded so
+        # repeated runs produce identical predicted frames
+        rng = np.random.default_rng(42)
+
         # Use accelerated melting model
         future_areas = self.apply_accelerated_melting(future_years)
         current_area = self.metrics['glacier_area'][-1]
@@ -199,7 +206,7 @@ class GlacierPredictor:
 
                 # Apply darkening to remaining glacier (ice melting/getting dirty)
                 for c in range(predicted_img.shape[2]):
-                    channel = predicted_img[:, :, c].astype(float)
+                    channel = predicted_img[:, :, c].astype(np.float32)
 
                     # Strong darkening for remaining bright glacier areas
                     channel = np.where(glacier_mask_eroded & bright_glacier,
@@ -212,40 +219,40 @@ class GlacierPredictor:
                     predicted_img[:, :, c] = np.clip(channel, 0, 255).astype(np.uint8)
 
                 # Convert lost glacier areas to rock/debris (brownish/gray)
+                # Draw random texture only for the affected pixels instead of
+                # allocating full-frame random arrays that mostly get discarded
                 if np.any(lost_glacier):
-                    # Get underlying terrain color by darkening significantly
+                    lost_idx = np.nonzero(lost_glacier)
+                    n_lost = lost_idx[0].size
                     for c in range(predicted_img.shape[2]):
-                        channel = predicted_img[:, :, c].astype(float)
                         # Make lost glacier areas dark gray/brown (exposed rock)
-                        rock_color = 80 + np.random.randint(-20, 20, predicted_img.shape[:2])
-                        channel = np.where(lost_glacier, rock_color, channel)
-                        predicted_img[:, :, c] = np.clip(channel, 0, 255).astype(np.uint8)
+                        rock_color = 80 + rng.integers(-20, 20, n_lost)
+                        predicted_img[:, :, c][lost_idx] = np.clip(rock_color, 0, 255).astype(np.uint8)
 
                 # Add texture variation to simulate debris on remaining glacier
                 if years_ahead > 3:
-                    noise_intensity = min(years_ahead * 1.5, 30)
-                    noise = np.random.randint(-noise_intensity, noise_intensity//2,
-                                             predicted_img.shape, dtype=np.int16)
+                    # Generator.integers wants integer bounds (the legacy
+                    # randint silently truncated floats)
+                    noise_intensity = int(min(years_ahead * 1.5, 30))
+                    eroded_idx = np.nonzero(glacier_mask_eroded)
+                    n_eroded = eroded_idx[0].size
                     for c in range(predicted_img.shape[2]):
+                        noise = rng.integers(-noise_intensity, noise_intensity//2,
+                                             n_eroded, dtype=np.int16)
                         channel = predicted_img[:, :, c].astype(np.int16)
-                        channel = np.where(glacier_mask_eroded,
-                                          channel + noise[:,:,c], channel)
+                        channel[eroded_idx] += noise
                         predicted_img[:, :, c] = np.clip(channel, 0, 255).astype(np.uint8)
 
                 # Add some brownish tint to simulate dirt on glacier for distant years
                 if years_ahead > 10:
-                    dirt_mask = glacier_mask_eroded & (np.random.rand(*predicted_img.shape[:2]) < 0.3)
+                    eroded_idx = np.nonzero(glacier_mask_eroded)
+                    keep = rng.random(eroded_idx[0].size) < 0.3
+                    dirt_idx = (eroded_idx[0][keep], eroded_idx[1][keep])
                     if predicted_img.shape[2] >= 3:
                         # Add brown tint (more red, less blue)
-                        predicted_img[:, :, 0] = np.where(dirt_mask,
-                            np.clip(predicted_img[:, :, 0] * 0.9, 0, 255),
-                            predicted_img[:, :, 0]).astype(np.uint8)
-                        predicted_img[:, :, 1] = np.where(dirt_mask,
-                            np.clip(predicted_img[:, :, 1] * 0.85, 0, 255),
-                            predicted_img[:, :, 1]).astype(np.uint8)
-                        predicted_img[:, :, 2] = np.where(dirt_mask,
-                            np.clip(predicted_img[:, :, 2] * 0.7, 0, 255),
-                            predicted_img[:, :, 2]).astype(np.uint8)
+                        for c, factor in enumerate((0.9, 0.85, 0.7)):
+                            tinted = predicted_img[:, :, c][dirt_idx] * factor
+                            predicted_img[:, :, c][dirt_idx] = np.clip(tinted, 0, 255).astype(np.uint8)
             else:
                 predicted_img = (reference_img * ratio).astype(np.uint8)
 
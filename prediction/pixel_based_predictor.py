@@ -1,4 +1,6 @@
 import numpy as np
+import matplotlib
+matplotlib.use('Agg')  # savefig-only script; skip GUI backend probing
 import matplotlib.pyplot as plt
 from PIL import Image
 from sklearn.linear_model import Ridge, LinearRegression
@@ -276,11 +278,13 @@ class PixelBasedGlacierPredictor:
             axes[1].axis('off')
             
             # Difference map
+            # float32 keeps dB-scale differences exact at half the memory
+            # traffic of the default float64 casts
             if len(last_img.shape) == 3:
-                diff = np.abs(pred_img.astype(float) - last_img.astype(float))
-                diff_gray = np.mean(diff, axis=2)
+                diff = np.abs(pred_img.astype(np.float32) - last_img.astype(np.float32))
+                diff_gray = np.mean(diff, axis=2, dtype=np.float32)
             else:
-                diff_gray = np.abs(pred_img.astype(float) - last_img.astype(float))
+                diff_gray = np.abs(pred_img.astype(np.float32) - last_img.astype(np.float32))
             
             im = axes[2].imshow(diff_gray, cmap='hot', vmin=0, vmax=50)
             axes[2].set_title('Difference Map', fontsize=14, fontweight='bold')
@@ -315,9 +319,15 @@ class PixelBasedGlacierPredictor:
         height, width = self.image_shape[:2]
         num_channels = self.image_shape[2] if len(self.image_shape) == 3 else 1
 
-        # Start with historical data
+        # Start with historical data. Room for the predicted years is
+        # preallocated up front so each autoregressive step fills one slice
+        # in place instead of re-copying the whole stack with np.append.
+        n_hist = len(self.years)
+        stack = np.empty((n_hist + len(target_years),) + self.images.shape[1:],
+                         dtype=self.images.dtype)
+        stack[:n_hist] = self.images
         current_years = self.years.copy()
-        current_images = self.images.copy()
+        current_images = stack[:n_hist]
 
         predicted_images = []
 
@@ -411,7 +421,8 @@ class PixelBasedGlacierPredictor:
 
             # Add prediction to training data for next iteration (AUTOREGRESSIVE)
             current_years = np.append(current_years, target_year)
-            current_images = np.append(current_images, [predicted_img], axis=0)
+            stack[len(current_years) - 1] = predicted_img
+            current_images = stack[:len(current_years)]
 
             print(f"  ✓ Completed prediction for {target_year}")
             print(f"  ✓ Added to training data (now have {len(current_years)} years)")
@@ -430,9 +441,15 @@ class PixelBasedGlacierPredictor:
         height, width = self.image_shape[:2]
         num_channels = self.image_shape[2] if len(self.image_shape) == 3 else 1
 
-        # Start with historical data
+        # Start with historical data. Room for the predicted years is
+        # preallocated up front so each autoregressive step fills one slice
+        # in place instead of re-copying the whole stack with np.append.
+        n_hist = len(self.years)
+        stack = np.empty((n_hist + len(target_years),) + self.images.shape[1:],
+                         dtype=self.images.dtype)
+        stack[:n_hist] = self.images
         current_years = self.years.copy()
-        current_images = self.images.copy()
+        current_images = stack[:n_hist]
 
         predicted_images = []
 
@@ -499,7 +516,8 @@ class PixelBasedGlacierPredictor:
 
             # Add to training data (AUTOREGRESSIVE)
             current_years = np.append(current_years, target_year)
-            current_images = np.append(current_images, [predicted_img], axis=0)
+            stack[len(current_years) - 1] = predicted_img
+            current_images = stack[:len(current_years)]
 
             print(f"  ✓ Completed prediction for {target_year}")
 